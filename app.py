@@ -1,45 +1,153 @@
 from __future__ import annotations
 
+import csv
 import os
+import queue
 import sqlite3
-from contextlib import closing
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
 from datetime import date, datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from fastapi import FastAPI, Form, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, Response
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache, TemplateNotFound
+from pydantic import BaseModel
 
 
 APP_DIR = Path(__file__).parent
 DB_PATH = APP_DIR / "expenses.db"
 TEMPLATES_DIR = APP_DIR / "templates"
 STATIC_DIR = APP_DIR / "static"
+DB_POOL_SIZE = 4
+CSV_BATCH_SIZE = 500
+
+_db_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=DB_POOL_SIZE)
+
+# Month totals keyed by "YYYY-MM", least recently used first
+MONTH_TOTAL_CACHE_SIZE = 512
+_month_total_cache: "OrderedDict[str, float]" = OrderedDict()
+_month_total_lock = threading.Lock()
 
 
 def get_db_connection() -> sqlite3.Connection:
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    # Pooled connections are handed between request threads
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    # WAL lets readers proceed while /add or /delete commit; it persists in the
+    # database file, so re-issuing it here is a no-op after the first time
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    # Per-connection settings; applied once since the connection is reused
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    conn.execute("PRAGMA cache_size=-20000")
     return conn
 
 
+def open_db_pool() -> None:
+    """Fill the shared connection pool. Call after the schema is ready."""
+    while not _db_pool.full():
+        _db_pool.put(get_db_connection())
+
+
+def close_db_pool() -> None:
+    while True:
+        try:
+            conn = _db_pool.get_nowait()
+        except queue.Empty:
+            return
+        conn.close()
+
+
+@contextmanager
+def borrow_conn() -> Iterator[sqlite3.Connection]:
+    """Borrow a connection from the pool, returning it when done.
+
+    Never blocks: when the pool is empty (all connections busy, or startup has not
+    filled it) a fresh connection is opened, and closed again if the pool is full.
+    """
+    try:
+        conn = _db_pool.get_nowait()
+    except queue.Empty:
+        conn = get_db_connection()
+    try:
+        yield conn
+    finally:
+        # Never hand a half-finished transaction to the next borrower
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            _db_pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+# Stored item_type codes; the position in this tuple is the code
+ITEM_TYPES = ("liquid", "solid", "utility", "fixed")
+ITEM_TYPE_CODES = {name: code for code, name in enumerate(ITEM_TYPES)}
+UNITS = ("L", "kg", "units", "fixed")  # unit per item_type code
+
+
+def create_expenses_table(conn: sqlite3.Connection, table: str = "expenses") -> None:
+    # Clustered on (entry_date, id): rows are stored in date order, so date range
+    # scans read the table directly instead of going through a rowid lookup
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            id INTEGER NOT NULL,  -- assigned from expense_ids by INSERT_EXPENSE_SQL
+            entry_date TEXT NOT NULL,
+            item_name TEXT NOT NULL,
+            item_type INTEGER NOT NULL CHECK(item_type BETWEEN 0 AND 3),  -- index into ITEM_TYPES
+            quantity REAL NOT NULL CHECK(quantity >= 0),
+            unit_price REAL NOT NULL CHECK(unit_price >= 0),
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (entry_date, id)
+        ) WITHOUT ROWID
+        """
+    )
+
+
+def autoincrement_seq(conn: sqlite3.Connection) -> int:
+    """Return the legacy AUTOINCREMENT high-water mark for expenses, or 0 if there is none."""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_sequence'").fetchone():
+        return 0
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='expenses'").fetchone()
+    return row[0] if row else 0
+
+
+def ensure_id_counter(conn: sqlite3.Connection, floor: int = 0) -> None:
+    """Create the expense_ids counter and the trigger that advances it on insert.
+
+    The counter only ever moves forward (to at least floor and MAX(id)), so ids of
+    deleted rows are never handed out again.
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS expense_ids (last_id INTEGER NOT NULL)")
+    conn.execute("INSERT INTO expense_ids (last_id) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM expense_ids)")
+    conn.execute(
+        "UPDATE expense_ids SET last_id = MAX(last_id, ?, IFNULL((SELECT MAX(id) FROM expenses), 0))",
+        (floor,),
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS expenses_advance_id AFTER INSERT ON expenses
+        BEGIN
+            UPDATE expense_ids SET last_id = NEW.id WHERE NEW.id > last_id;
+        END
+        """
+    )
+
+
 def init_db() -> None:
     with closing(get_db_connection()) as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS expenses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entry_date TEXT NOT NULL,
-                item_name TEXT NOT NULL,
-                item_type TEXT NOT NULL CHECK(item_type IN ('liquid','solid','utility','fixed')),
-                quantity REAL NOT NULL CHECK(quantity >= 0),
-                unit_price REAL NOT NULL CHECK(unit_price >= 0),
-                created_at TEXT NOT NULL
-            )
-            """
-        )
+        create_expenses_table(conn)
+        ensure_id_counter(conn, autoincrement_seq(conn))
         conn.commit()
 
 
@@ -48,7 +156,9 @@ def migrate_db_if_needed() -> None:
 
     Handles:
     - Legacy month-based schema using `entry_month` -> converts to `entry_date` (YYYY-MM-01)
-    - Legacy CHECK on item_type missing 'fixed' -> recreates table with updated CHECK
+    - Legacy TEXT item_type (with or without 'fixed' in its CHECK) -> INTEGER code into ITEM_TYPES
+    - Legacy rowid table -> WITHOUT ROWID table clustered on (entry_date, id), keeping ids
+      and carrying the AUTOINCREMENT sequence over into expense_ids
     """
     with closing(get_db_connection()) as conn:
         cur = conn.execute("SELECT name, sql FROM sqlite_master WHERE type='table' AND name='expenses'")
@@ -58,54 +168,49 @@ def migrate_db_if_needed() -> None:
 
         table_sql = row[1] or ""
         needs_month_migration = "entry_month" in table_sql and "entry_date" not in table_sql
-        needs_fixed_check = ("CHECK" in table_sql and "'fixed'" not in table_sql)
+        needs_int_type = "item_type TEXT" in table_sql
+        needs_clustering = "WITHOUT ROWID" not in table_sql
 
-        if not needs_month_migration and not needs_fixed_check:
+        if not needs_month_migration and not needs_int_type and not needs_clustering:
             return
 
         # Create new table with current schema
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS expenses_new (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entry_date TEXT NOT NULL,
-                item_name TEXT NOT NULL,
-                item_type TEXT NOT NULL CHECK(item_type IN ('liquid','solid','utility','fixed')),
-                quantity REAL NOT NULL CHECK(quantity >= 0),
-                unit_price REAL NOT NULL CHECK(unit_price >= 0),
-                created_at TEXT NOT NULL
-            )
-            """
-        )
+        create_expenses_table(conn, "expenses_new")
+
+        # Build the copy statement based on old schema
+        if needs_month_migration:
+            # Convert entry_month (YYYY-MM) -> entry_date (YYYY-MM-01)
+            entry_date_expr = "substr(entry_month || '-01', 1, 10)"
+        else:
+            entry_date_expr = "entry_date"
+        if needs_int_type:
+            whens = " ".join(f"WHEN '{name}' THEN {code}" for code, name in enumerate(ITEM_TYPES))
+            item_type_expr = f"CASE item_type {whens} END"
+        else:
+            item_type_expr = "item_type"
+
+        # Dropping an AUTOINCREMENT table also drops its sqlite_sequence entry
+        last_seq = autoincrement_seq(conn)
 
-        # Determine copy statement based on old schema
         try:
-            if needs_month_migration:
-                # Convert entry_month (YYYY-MM) -> entry_date (YYYY-MM-01)
-                conn.execute(
-                    """
-                    INSERT INTO expenses_new (id, entry_date, item_name, item_type, quantity, unit_price, created_at)
-                    SELECT id,
-                           substr(entry_month || '-01', 1, 10) AS entry_date,
-                           item_name,
-                           item_type,
-                           quantity,
-                           unit_price,
-                           created_at
-                    FROM expenses
-                    """
-                )
-            else:
-                # Same columns; just copy data to update CHECK constraint
-                conn.execute(
-                    """
-                    INSERT INTO expenses_new (id, entry_date, item_name, item_type, quantity, unit_price, created_at)
-                    SELECT id, entry_date, item_name, item_type, quantity, unit_price, created_at FROM expenses
-                    """
-                )
+            conn.execute(
+                f"""
+                INSERT INTO expenses_new (id, entry_date, item_name, item_type, quantity, unit_price, created_at)
+                SELECT id,
+                       {entry_date_expr} AS entry_date,
+                       item_name,
+                       {item_type_expr} AS item_type,
+                       quantity,
+                       unit_price,
+                       created_at
+                FROM expenses
+                """
+            )
 
             conn.execute("DROP TABLE expenses")
             conn.execute("ALTER TABLE expenses_new RENAME TO expenses")
+            # The old table's trigger went with it
+            ensure_id_counter(conn, last_seq)
             conn.commit()
         finally:
             # Clean up in case the new table still exists due to partial migration
@@ -115,10 +220,49 @@ def migrate_db_if_needed() -> None:
                 pass
 
 
+def ensure_indexes() -> None:
+    """Create secondary indexes for the date-filtered queries and refresh planner stats.
+
+    Runs after migration because rebuilding the table drops its indexes.
+    """
+    with closing(get_db_connection()) as conn:
+        # Date lookups use the (entry_date, id) primary key; this serves id lookups
+        # and keeps ids unique
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_expenses_id ON expenses(id)")
+        # Partial covering indexes for the fixed/daily SUMs; item_type is carried in the
+        # index so SQLite can answer them without reading the table
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_expenses_fixed_date ON expenses(entry_date, item_type, quantity, unit_price) "
+            "WHERE item_type = 3"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_expenses_daily_date ON expenses(entry_date, item_type, quantity, unit_price) "
+            "WHERE item_type <> 3"
+        )
+        conn.execute("ANALYZE")
+        conn.commit()
+
+
 def normalize_date(d: Optional[str]) -> str:
     """Normalize date input to YYYY-MM-DD format."""
     if not d:
         return date.today().isoformat()
+    parsed = _parse_date(d)
+    if parsed is None:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    return parsed
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(d: str) -> Optional[str]:
+    """Return d as YYYY-MM-DD, or None if it is not a recognised date."""
+    # Fast path: already YYYY-MM-DD, only the calendar values need checking
+    if len(d) == 10 and d[4] == "-" and d[7] == "-" and d.isascii() and (d[:4] + d[5:7] + d[8:]).isdigit():
+        try:
+            date(int(d[:4]), int(d[5:7]), int(d[8:]))
+            return d
+        except ValueError:
+            pass
     try:
         return datetime.fromisoformat(d).date().isoformat()
     except ValueError:
@@ -128,86 +272,182 @@ def normalize_date(d: Optional[str]) -> str:
                 return datetime.strptime(d, fmt).date().isoformat()
             except ValueError:
                 pass
-    raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    return None
 
 
-def unit_for_type(item_type: str) -> str:
-    if item_type == "liquid":
-        return "L"
-    elif item_type == "solid":
-        return "kg"
-    elif item_type == "utility":
-        return "units"
-    else:  # fixed
-        return "fixed"
+# Columns read by _expense_items(), in order
+EXPENSE_ITEM_COLUMNS = """
+    id, entry_date, item_name, item_type, quantity, unit_price,
+    (quantity * unit_price) AS line_total,
+    item_type = 3 AS is_fixed  -- 3 = fixed
+"""
 
 
-def fetch_expenses_for_date(entry_date: str) -> Tuple[List[sqlite3.Row], float]:
-    with closing(get_db_connection()) as conn:
-        rows = list(
-            conn.execute(
-                """
-                SELECT id, entry_date, item_name, item_type, quantity, unit_price
-                FROM expenses
-                WHERE entry_date = ?
-                ORDER BY id DESC
-                """,
-                (entry_date,),
-            )
-        )
-        total = sum((r["quantity"] * r["unit_price"]) for r in rows)
-        return rows, total
+def _expense_items(rows: Iterable[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+    """Turn EXPENSE_ITEM_COLUMNS tuples into item dicts with type names and units."""
+    return [
+        {
+            "id": rid,
+            "entry_date": edate,
+            "item_name": name,
+            "item_type": ITEM_TYPES[itype],
+            "quantity": qty,
+            "unit_price": up,
+            "unit": UNITS[itype],
+            "line_total": round(line_total, 2),
+            "is_fixed": is_fixed,
+        }
+        for rid, edate, name, itype, qty, up, line_total, is_fixed in rows
+    ]
 
 
-def fetch_expenses_for_range(start_date: str, end_date: str) -> Tuple[List[sqlite3.Row], float]:
-    with closing(get_db_connection()) as conn:
-        rows = list(
-            conn.execute(
+def _select_day_tuples(conn: sqlite3.Connection, entry_date: str, fixed_first: bool = False) -> List[Tuple[Any, ...]]:
+    """Return the day's EXPENSE_ITEM_COLUMNS tuples newest first; with fixed_first, all fixed items come first."""
+    order_by = "is_fixed DESC, id DESC" if fixed_first else "id DESC"
+    return conn.execute(
+        f"""
+        SELECT {EXPENSE_ITEM_COLUMNS}
+        FROM expenses
+        WHERE entry_date = ?
+        ORDER BY {order_by}
+        """,
+        (entry_date,),
+    ).fetchall()
+
+
+def _select_day_rows(conn: sqlite3.Connection, entry_date: str, fixed_first: bool = False) -> List[Dict[str, Any]]:
+    return _expense_items(_select_day_tuples(conn, entry_date, fixed_first))
+
+
+def _select_day_sums_by_type(conn: sqlite3.Connection, entry_date: str) -> Tuple[float, float]:
+    """Return the unrounded (fixed_sum, daily_sum) for a single date, aggregated in SQL."""
+    # `item_type = 3` / `<> 3` must stay literal for SQLite to pick the partial indexes
+    fixed_sum, daily_sum = conn.execute(
+        """
+        SELECT (SELECT SUM(quantity * unit_price) FROM expenses WHERE entry_date = ? AND item_type = 3),
+               (SELECT SUM(quantity * unit_price) FROM expenses WHERE entry_date = ? AND item_type <> 3)
+        """,
+        (entry_date, entry_date),
+    ).fetchone()
+    return fixed_sum or 0.0, daily_sum or 0.0
+
+
+def _select_day_totals_by_type(conn: sqlite3.Connection, entry_date: str) -> Tuple[float, float]:
+    """Return (fixed_total, daily_total) for a single date, each rounded for display."""
+    fixed_sum, daily_sum = _select_day_sums_by_type(conn, entry_date)
+    return round(fixed_sum, 2), round(daily_sum, 2)
+
+
+def _cached_month_total(conn: sqlite3.Connection, any_date: str) -> float:
+    # Callers already hold a pooled connection, so a lock holder never waits on the pool
+    month = any_date[:7]
+    total = _lookup_month_total(month)
+    if total is not None:
+        return total
+    with _month_total_lock:
+        total = _month_total_cache.get(month)
+        if total is None:
+            start_s, end_s, _label = month_bounds_and_label(any_date)
+            # Fixed and daily halves are summed separately so each uses its partial index
+            cur = conn.execute(
                 """
-                SELECT id, entry_date, item_name, item_type, quantity, unit_price
-                FROM expenses
-                WHERE entry_date >= ? AND entry_date <= ?
-                ORDER BY entry_date DESC, id DESC
+                SELECT IFNULL((SELECT SUM(quantity * unit_price) FROM expenses
+                               WHERE entry_date BETWEEN ? AND ? AND item_type = 3), 0.0)
+                     + IFNULL((SELECT SUM(quantity * unit_price) FROM expenses
+                               WHERE entry_date BETWEEN ? AND ? AND item_type <> 3), 0.0) AS total
                 """,
-                (start_date, end_date),
+                (start_s, end_s, start_s, end_s),
             )
-        )
-        total = sum((r["quantity"] * r["unit_price"]) for r in rows)
-        return rows, total
+            total = round(cur.fetchone()[0], 2)
+            _month_total_cache[month] = total
+            if len(_month_total_cache) > MONTH_TOTAL_CACHE_SIZE:
+                _month_total_cache.popitem(last=False)
+        return total
 
 
-def month_total_for_date(any_date: str) -> float:
-    """Compute total (including fixed) for the entire month of the given date (YYYY-MM-DD)."""
-    d = datetime.fromisoformat(any_date).date()
-    start = d.replace(day=1)
-    # Compute first day of next month
-    if start.month == 12:
-        next_month = start.replace(year=start.year + 1, month=1, day=1)
-    else:
-        next_month = start.replace(month=start.month + 1, day=1)
-    start_s = start.isoformat()
-    end_s = (next_month - date.resolution).isoformat()  # inclusive end of month
-    with closing(get_db_connection()) as conn:
-        cur = conn.execute(
-            """
-            SELECT SUM(quantity * unit_price) AS total
+def _lookup_month_total(month: str) -> Optional[float]:
+    total = _month_total_cache.get(month)
+    if total is not None:
+        try:
+            _month_total_cache.move_to_end(month)
+        except KeyError:
+            pass  # dropped by invalidate_month_total() in the meantime
+    return total
+
+
+def fetch_expenses_for_date(entry_date: str) -> Tuple[List[Dict[str, Any]], float]:
+    with borrow_conn() as conn:
+        raw = _select_day_tuples(conn, entry_date)
+    # Summed from the same rows, before per-item rounding, so the total matches the items
+    # and is rounded only once by the caller
+    total = sum(r[6] for r in raw)
+    return _expense_items(raw), total
+
+
+def day_total_for_date(entry_date: str) -> float:
+    with borrow_conn() as conn:
+        fixed_sum, daily_sum = _select_day_sums_by_type(conn, entry_date)
+    return round(fixed_sum + daily_sum, 2)
+
+
+def fetch_day_view(entry_date: str) -> Tuple[List[Dict[str, Any]], Tuple[float, float], float]:
+    """Return (rows, (fixed_total, daily_total), month_total) for the home page.
+
+    rows lists fixed items first. All three come from one borrowed connection.
+    """
+    with borrow_conn() as conn:
+        rows = _select_day_rows(conn, entry_date, fixed_first=True)
+        day_totals = _select_day_totals_by_type(conn, entry_date)
+        month_total = _cached_month_total(conn, entry_date)
+    return rows, day_totals, month_total
+
+
+def fetch_expenses_for_range(start_date: str, end_date: str) -> Tuple[List[Dict[str, Any]], float]:
+    with borrow_conn() as conn:
+        raw = conn.execute(
+            f"""
+            SELECT {EXPENSE_ITEM_COLUMNS}
             FROM expenses
-            WHERE entry_date >= ? AND entry_date <= ?
+            WHERE entry_date BETWEEN ? AND ?
+            ORDER BY entry_date DESC, id DESC
             """,
-            (start_s, end_s),
-        )
-        row = cur.fetchone()
-        total = float(row[0]) if row and row[0] is not None else 0.0
-        return round(total, 2)
+            (start_date, end_date),
+        ).fetchall()
+    total = sum(r[6] for r in raw)  # unrounded line_total
+    return _expense_items(raw), total
+
+
+def month_total_for_date(any_date: str) -> float:
+    """Compute total (including fixed) for the entire month of the given date (YYYY-MM-DD).
+
+    Totals are memoized per month (up to MONTH_TOTAL_CACHE_SIZE months); writers call
+    invalidate_month_total() after committing. The cache lives in this process, so it
+    assumes a single worker and no outside writers to the database.
+    """
+    total = _lookup_month_total(any_date[:7])
+    if total is not None:
+        return total
+    with borrow_conn() as conn:
+        return _cached_month_total(conn, any_date)
+
+
+def invalidate_month_total(any_date: str) -> None:
+    """Drop the memoized total for the month containing any_date."""
+    with _month_total_lock:
+        _month_total_cache.pop(any_date[:7], None)
 
 
 def month_bounds_and_label(any_date: str) -> Tuple[str, str, str]:
-    """Return (start_iso, end_iso, label) for the month containing any_date.
+    """Return (start_iso, end_iso, label) for the month containing any_date (YYYY-MM-DD).
 
     label is like 'October 2025'.
     """
-    d = datetime.fromisoformat(any_date).date()
-    start = d.replace(day=1)
+    return _month_bounds(any_date[:7])
+
+
+@lru_cache(maxsize=256)
+def _month_bounds(yyyymm: str) -> Tuple[str, str, str]:
+    start = date(int(yyyymm[:4]), int(yyyymm[5:7]), 1)
     if start.month == 12:
         next_month = start.replace(year=start.year + 1, month=1, day=1)
     else:
@@ -224,6 +464,10 @@ app = FastAPI(title="Daily Expense Tracker")
 TEMPLATES_DIR.mkdir(exist_ok=True)
 STATIC_DIR.mkdir(exist_ok=True)
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+# Compiled templates survive restarts (Jinja's default per-user, owner-only cache dir);
+# set TEMPLATES_AUTO_RELOAD=1 to pick up template edits while developing
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+templates.env.auto_reload = os.environ.get("TEMPLATES_AUTO_RELOAD") == "1"
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
@@ -231,38 +475,29 @@ app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 def on_startup() -> None:
     init_db()
     migrate_db_if_needed()
+    ensure_indexes()
+    open_db_pool()
+    # Compile the page template now so the first request doesn't pay for it
+    try:
+        templates.env.get_template("index.html")
+    except TemplateNotFound:
+        pass  # rendering will report it on first request, as before
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    close_db_pool()
 
 
 @app.get("/", response_class=HTMLResponse)
 def index(request: Request, d: Optional[str] = Query(default=None, alias="date")) -> HTMLResponse:
     entry_date = normalize_date(d)
-    rows, _ignored_total = fetch_expenses_for_date(entry_date)
-    
-    # Separate fixed expenses from daily expenses
-    fixed_items = []
-    daily_items = []
-    fixed_total = 0.0
-    daily_total = 0.0
-    
-    for r in rows:
-        item = {
-            "id": r["id"],
-            "entry_date": r["entry_date"],
-            "item_name": r["item_name"],
-            "item_type": r["item_type"],
-            "quantity": r["quantity"],
-            "unit_price": r["unit_price"],
-            "unit": unit_for_type(r["item_type"]),
-            "line_total": round(r["quantity"] * r["unit_price"], 2),
-        }
-        if r["item_type"] == "fixed":
-            fixed_items.append(item)
-            fixed_total += item["line_total"]
-        else:
-            daily_items.append(item)
-            daily_total += item["line_total"]
-    
-    month_total = month_total_for_date(entry_date)
+    rows, (fixed_total, daily_total), month_total = fetch_day_view(entry_date)
+
+    # Rows come back fixed-first, so the two sections are slices of one list
+    split = next((i for i, item in enumerate(rows) if not item["is_fixed"]), len(rows))
+    fixed_items, daily_items = rows[:split], rows[split:]
+
     _ms, _me, month_label = month_bounds_and_label(entry_date)
 
     grand_total = round(fixed_total + daily_total, 2)
@@ -274,8 +509,8 @@ def index(request: Request, d: Optional[str] = Query(default=None, alias="date")
             "entry_date": entry_date,
             "fixed_items": fixed_items,
             "daily_items": daily_items,
-            "fixed_total": round(fixed_total, 2),
-            "daily_total": round(daily_total, 2),
+            "fixed_total": fixed_total,
+            "daily_total": daily_total,
             "total": grand_total,
             "month_total": month_total,
             "month_label": month_label,
@@ -283,51 +518,64 @@ def index(request: Request, d: Optional[str] = Query(default=None, alias="date")
     )
 
 
+class _Echo:
+    """File-like object whose write() hands back the line, so csv.writer can feed a generator."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
 @app.get("/download/month")
-def download_month(d: Optional[str] = Query(default=None, alias="date")) -> Response:
-    """Download CSV for all expenses in the month of the given date."""
+def download_month(d: Optional[str] = Query(default=None, alias="date")) -> StreamingResponse:
+    """Download CSV for all expenses in the month of the given date.
+
+    Rows are streamed from the cursor in batches, so memory use does not grow with the month.
+    """
     entry_date = normalize_date(d)
     start_s, end_s, month_label = month_bounds_and_label(entry_date)
-    with closing(get_db_connection()) as conn:
-        rows = list(
-            conn.execute(
+
+    def iter_csv() -> Iterator[str]:
+        writer = csv.writer(_Echo())
+        yield writer.writerow(["date", "item_name", "item_type", "quantity", "unit_price", "line_total"])
+        # The connection stays borrowed until the last row has been sent
+        with borrow_conn() as conn:
+            cur = conn.execute(
                 """
-                SELECT entry_date, item_name, item_type, quantity, unit_price
+                SELECT entry_date, item_name, item_type, quantity, unit_price,
+                       (quantity * unit_price) AS line_total
                 FROM expenses
-                WHERE entry_date >= ? AND entry_date <= ?
+                WHERE entry_date BETWEEN ? AND ?
                 ORDER BY entry_date ASC, id ASC
                 """,
                 (start_s, end_s),
             )
-        )
-    # Build CSV
-    import io, csv
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(["date", "item_name", "item_type", "quantity", "unit_price", "line_total"])
-    for r in rows:
-        q = float(r["quantity"]) if r["quantity"] is not None else 0.0
-        up = float(r["unit_price"]) if r["unit_price"] is not None else 0.0
-        writer.writerow([r["entry_date"], r["item_name"], r["item_type"], q, up, round(q * up, 2)])
-    csv_data = buf.getvalue()
+            # One chunk per batch: each yielded chunk costs a threadpool hop in StreamingResponse
+            while batch := cur.fetchmany(CSV_BATCH_SIZE):
+                yield "".join(
+                    writer.writerow([edate, name, ITEM_TYPES[itype], qty, up, round(line_total, 2)])
+                    for edate, name, itype, qty, up, line_total in batch
+                )
+
     filename = f"expenses_{month_label.replace(' ', '_')}.csv"
     headers = {
         "Content-Disposition": f"attachment; filename=\"{filename}\"",
         "Content-Type": "text/csv; charset=utf-8",
     }
-    return Response(content=csv_data, media_type="text/csv", headers=headers)
+    return StreamingResponse(iter_csv(), media_type="text/csv", headers=headers)
 
 
-@app.post("/add")
-def add_item(
-    item_name: str = Form(...),
-    item_type: Optional[str] = Form(None),  # defaults to 'utility' if not provided
-    quantity: Optional[float] = Form(None),
-    unit_price: float = Form(...),
-    entry_date: str = Form(...),
-) -> RedirectResponse:
+def prepare_expense(
+    item_name: str,
+    item_type: Optional[str],
+    quantity: Optional[float],
+    unit_price: float,
+    entry_date: str,
+) -> Tuple[str, str, int, float, float]:
+    """Validate one submitted expense and return (entry_date, item_name, item_type_code, quantity, unit_price)."""
     entry_date = normalize_date(entry_date)
     item_type = (item_type or "utility").lower().strip()
+    if item_type not in ITEM_TYPE_CODES:
+        raise HTTPException(status_code=400, detail="item_type must be one of liquid, solid, utility, fixed")
     # For non-liquid submissions where quantity isn't provided, default to 1.0
     if item_type in ("fixed", "utility", "solid") and quantity is None:
         quantity = 1.0
@@ -335,27 +583,78 @@ def add_item(
         raise HTTPException(status_code=400, detail="quantity is required")
     if quantity < 0 or unit_price < 0:
         raise HTTPException(status_code=400, detail="quantity and unit_price must be non-negative")
+    return entry_date, item_name.strip(), ITEM_TYPE_CODES[item_type], float(quantity), float(unit_price)
 
-    with closing(get_db_connection()) as conn:
-        conn.execute(
-            """
-            INSERT INTO expenses (entry_date, item_name, item_type, quantity, unit_price, created_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (entry_date, item_name.strip(), item_type, float(quantity), float(unit_price), datetime.utcnow().isoformat()),
-        )
+
+# created_at is UTC, second resolution; time.strftime skips building a datetime per insert
+CREATED_AT_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# The table has no rowid to auto-assign ids from; the next id comes from the
+# expense_ids counter, which the expenses_advance_id trigger bumps in the same
+# statement (under SQLite's write lock)
+INSERT_EXPENSE_SQL = """
+    INSERT INTO expenses (id, entry_date, item_name, item_type, quantity, unit_price, created_at)
+    VALUES ((SELECT last_id + 1 FROM expense_ids), ?, ?, ?, ?, ?, ?)
+"""
+
+
+class ExpenseIn(BaseModel):
+    item_name: str
+    item_type: Optional[str] = None  # defaults to 'utility' if not provided
+    quantity: Optional[float] = None
+    unit_price: float
+    entry_date: str
+
+
+@app.post("/add")
+def add_item(
+    item_name: str = Form(...),
+    item_type: Optional[str] = Form(None),  # defaults to 'utility' if not provided
+    quantity: Optional[float] = Form(None),
+    unit_price: float = Form(...),
+    entry_date: str = Form(...),
+) -> RedirectResponse:
+    expense = prepare_expense(item_name, item_type, quantity, unit_price, entry_date)
+    entry_date = expense[0]
+
+    with borrow_conn() as conn:
+        conn.execute(INSERT_EXPENSE_SQL, (*expense, time.strftime(CREATED_AT_FORMAT, time.gmtime())))
         conn.commit()
+    invalidate_month_total(entry_date)
 
     resp = RedirectResponse(url=f"/?date={entry_date}", status_code=303)
     return resp
 
 
+@app.post("/add/bulk")
+def add_items_bulk(items: List[ExpenseIn]) -> JSONResponse:
+    """Insert a JSON array of expenses in a single transaction.
+
+    Either every item is inserted or, if any item is invalid, none are.
+    """
+    created_at = time.strftime(CREATED_AT_FORMAT, time.gmtime())
+    rows = [
+        (*prepare_expense(i.item_name, i.item_type, i.quantity, i.unit_price, i.entry_date), created_at)
+        for i in items
+    ]
+    with borrow_conn() as conn:
+        with conn:  # commits on success, rolls back on error
+            conn.executemany(INSERT_EXPENSE_SQL, rows)
+    for entry_date in {r[0] for r in rows}:
+        invalidate_month_total(entry_date)
+    return JSONResponse({"inserted": len(rows)})
+
+
 @app.post("/delete/{item_id}")
 def delete_item(item_id: int, entry_date: str = Form(...)) -> RedirectResponse:
-    with closing(get_db_connection()) as conn:
-        conn.execute("DELETE FROM expenses WHERE id = ?", (item_id,))
+    entry_date = normalize_date(entry_date)
+    with borrow_conn() as conn:
+        # entry_date is the item's own date (the page it is listed on), so this hits the primary key
+        cur = conn.execute("DELETE FROM expenses WHERE entry_date = ? AND id = ?", (entry_date, item_id))
         conn.commit()
-    resp = RedirectResponse(url=f"/?date={normalize_date(entry_date)}", status_code=303)
+    if cur.rowcount:
+        invalidate_month_total(entry_date)
+    resp = RedirectResponse(url=f"/?date={entry_date}", status_code=303)
     return resp
 
 
@@ -370,9 +669,9 @@ def api_get_expenses(d: Optional[str] = Query(default=None, alias="date")) -> JS
             "item_name": r["item_name"],
             "item_type": r["item_type"],
             "quantity": r["quantity"],
-            "unit": unit_for_type(r["item_type"]),
+            "unit": r["unit"],
             "unit_price": r["unit_price"],
-            "line_total": round(r["quantity"] * r["unit_price"], 2),
+            "line_total": r["line_total"],
         }
         for r in rows
     ]
@@ -382,13 +681,16 @@ def api_get_expenses(d: Optional[str] = Query(default=None, alias="date")) -> JS
 @app.get("/api/total")
 def api_get_total(d: Optional[str] = Query(default=None, alias="date")) -> JSONResponse:
     entry_date = normalize_date(d)
-    _, total = fetch_expenses_for_date(entry_date)
+    total = day_total_for_date(entry_date)
     return JSONResponse({"date": entry_date, "total": round(total, 2)})
 
 
 if __name__ == "__main__":
     import uvicorn
 
+    # Dev server: --reload only watches .py files, so let Jinja notice template edits
+    os.environ.setdefault("TEMPLATES_AUTO_RELOAD", "1")
+
     uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True)
 
 